@@ -1,4 +1,5 @@
 import inspect
+import textwrap
 import types
 import typing
 from logging import getLogger
@@ -13,69 +14,188 @@ from .errors import CommandMessageError, CommandNotFoundError, CommandInfoError
 
 log = getLogger(__name__)  #
 
+_ERR_UNKNOWN_USER = ":grey_exclamation: 指定されたユーザーを特定できませんでした。数字IDを指定してください。"
+_ERR_UNKNOWN_ROLE = ":grey_exclamation: 指定された役職を特定できませんでした。数字IDを指定してください。"
+_ERR_ALLOWED_ALL = ":grey_exclamation: 全許可グループのためコマンドを指定できません"
+_ERR_ALREADY_SET = ":grey_exclamation: 既に設定されています"
+_ERR_ALREADY_ADDED = ":grey_exclamation: 既に追加されています"
+
+_MISSING = object()
+
 
 class ArgumentParser:
-    def parse(self, argument: str):
+    def parse(self, argument: str):  # argument is already lowercased
         raise NotImplemented
 
 
 class CommandEntryArgument(ArgumentParser):
     def parse(self, name: str) -> tuple[str, CommandEntry]:
         for category in DNCoreAPI.commands().config.categories.values():
-            if name.lower() in category.commands:
-                return name.lower(), category.commands[name.lower()]
-        raise CommandMessageError(f":grey_exclamation: コマンド `{name.lower()}` は定義されていません")
+            entry = category.commands.get(name, _MISSING)
+            if entry is not _MISSING:
+                return name, entry
+        raise CommandMessageError(f":grey_exclamation: コマンド `{name}` は定義されていません")
 
 
 class HandlerArgument(ArgumentParser):
     def parse(self, name: str) -> CommandHandler:
         try:
-            return DNCoreAPI.commands().handlers[name.lower()]
+            return DNCoreAPI.commands().handlers[name]
         except KeyError:
-            raise CommandMessageError(f":grey_exclamation: ハンドラID `{name.lower()}` は登録されていません")
+            raise CommandMessageError(f":grey_exclamation: ハンドラID `{name}` は登録されていません")
 
 
 class GroupArgument(ArgumentParser):
     def parse(self, name: str) -> tuple[str, PermissionGroup]:
         try:
-            return name.lower(), DNCoreAPI.commands().config.groups[name.lower()]
+            return name, DNCoreAPI.commands().config.groups[name]
         except KeyError:
-            raise CommandMessageError(f":grey_exclamation: グループ `{name.lower()}` は定義されていません")
+            raise CommandMessageError(f":grey_exclamation: グループ `{name}` は定義されていません")
 
 
 class CategoryArgument(ArgumentParser):
     def parse(self, argument: str) -> tuple[str, CommandCategory]:
         try:
-            return argument.lower(), DNCoreAPI.commands().config.categories[argument.lower()]
+            return argument, DNCoreAPI.commands().config.categories[argument]
         except KeyError:
-            raise CommandMessageError(f":grey_exclamation: カテゴリ `{argument.lower()}` は定義されていません")
+            raise CommandMessageError(f":grey_exclamation: カテゴリ `{argument}` は定義されていません")
+
+
+class NameArgument(ArgumentParser):
+    def parse(self, name: str) -> str:
+        return name
+
+
+class OptionalLiteral(object):
+    def __init__(self, name: str):
+        self.name = name
+
+
+LITERAL, PARSER, STR, LIST = range(4)
+
+
+class Slot(typing.NamedTuple):
+    kind: int
+    payload: typing.Any
+    optional: bool
+
+
+class DispatchNode(object):
+    __slots__ = ("literals", "parsers", "string", "lists", "handlers", "pending")
+
+    def __init__(self):
+        self.literals = {}  # type: dict[str, DispatchNode]
+        self.parsers = {}  # type: dict[type, tuple[ArgumentParser, DispatchNode]]
+        self.string = None  # type: DispatchNode | None
+        self.lists = []  # type: list[Handler]
+        self.handlers = []  # type: list[Handler]
+        self.pending = []  # type: list[Handler]
+
+    def insert(self, handler: "Handler"):
+        node = self
+        for idx, slot in enumerate(handler.slots):
+            # arguments may end here
+            (node.handlers if idx >= handler.min_args_size else node.pending).append(handler)
+
+            if slot.kind == LITERAL:
+                node = node.literals.setdefault(slot.payload, DispatchNode())
+
+            elif slot.kind == PARSER:
+                _, node = node.parsers.setdefault(type(slot.payload), (slot.payload, DispatchNode()))
+
+            elif slot.kind == STR:
+                if node.string is None:
+                    node.string = DispatchNode()
+                node = node.string
+
+            elif slot.kind == LIST:
+                node.lists.append(handler)  # consumes all remaining arguments
+                return
+
+        node.handlers.append(handler)
+
+    def walk(self, arguments: list[str], low: list[str], idx: int, args: list,
+             matched: "list[tuple[Handler, list]]", pending: "list[Handler]"):
+        if idx == len(arguments):
+            matched.extend((hdl, args) for hdl in self.handlers)
+            pending.extend(self.pending)
+            return
+
+        for hdl in self.lists:
+            matched.append((hdl, [*args, arguments[idx:]]))
+
+        node = self.literals.get(low[idx])
+        if node is not None:
+            node.walk(arguments, low, idx + 1, args, matched, pending)
+
+        for parser, node in self.parsers.values():
+            value = parser.parse(low[idx])
+            # composite results are spread into separate handler parameters
+            node.walk(arguments, low, idx + 1,
+                      [*args, *value] if isinstance(value, tuple) else [*args, value], matched, pending)
+
+        if self.string is not None:
+            self.string.walk(arguments, low, idx + 1, [*args, arguments[idx]], matched, pending)
 
 
 class Handler(object):
     handlers = []  # type: list[Handler]
+    dispatch = DispatchNode()
+    __slots__ = ("args", "handler", "docs", "order", "slots", "min_args_size", "params", "param_defaults", "param_optional")
 
     def __init__(self, *args):
         # self.name = name.lower()
         self.args = args
         self.handler = None
         self.docs = None
+        self.order = 0
+        self.slots = []  # type: list[Slot]
+        self.min_args_size = 0
+        self.params = []  # type: list[inspect.Parameter]
+        self.param_defaults = []
+        self.param_optional = []  # type: list[bool]
 
     def __call__(self, func):
         self.handler = func
-        self.docs = func.__doc__
+        self.docs = func.__doc__ and textwrap.dedent(func.__doc__)
+        self.order = len(self.handlers)
         self.handlers.append(self)
 
-    @property
-    def ignore_args_size(self):
-        if self.args:
-            typ = self.args[-1]
-            return typ is list or typ == list[str]
-        return False
+        self.params = list(inspect.signature(func).parameters.values())[2:]  # skip self, ctx
+        self.param_defaults = [parameter.default for parameter in self.params]
+        self.param_optional = [
+            isinstance(parameter.annotation, types.UnionType) and type(None) in typing.get_args(parameter.annotation)
+            for parameter in self.params
+        ]
+
+        self.slots = [self.compile_slot(typ) for typ in self.args]
+        self.min_args_size = max((idx + 1 for idx, slot in enumerate(self.slots) if not slot.optional), default=0)
+        self.dispatch.insert(self)
+
+    @staticmethod
+    def compile_slot(typ) -> Slot:
+        if isinstance(typ, OptionalLiteral):
+            return Slot(LITERAL, typ.name.lower(), True)
+
+        optional = False
+        if isinstance(typ, types.UnionType) and type(None) in typing.get_args(typ):
+            typ = typing.get_args(typ)[0]  # first only
+            optional = True
+
+        if isinstance(typ, str):
+            return Slot(LITERAL, typ.lower(), optional)
+        elif isinstance(typ, ArgumentParser):
+            return Slot(PARSER, typ, optional)
+        elif typ is str:
+            return Slot(STR, None, optional)
+        elif typ is list or typ == list[str]:
+            return Slot(LIST, None, optional)
+        raise TypeError(f"unsupported argument type: {typ!r}")
 
 
 class MyCommandHandler(object):
     def __init__(self):
-        pass
+        self._handlers_by_name = {}  # type: dict[str, CommandHandler]
 
     def get_command(self, ctx: CommandContext):
         arguments = ctx.arguments
@@ -83,80 +203,46 @@ class MyCommandHandler(object):
         if not arguments:
             raise CommandNotFoundError()
 
-        handlers = list(Handler.handlers)
-        _args = {hdl: [] for hdl in handlers}
-
-        for idx, arg in enumerate(arguments):
-            for cmd in list(handlers):
-                try:
-                    typ = cmd.args[idx]
-                except IndexError:
-                    if not cmd.ignore_args_size:
-                        handlers.remove(cmd)
-                    continue
-
-                if isinstance(typ, types.UnionType) and type(None) in typing.get_args(typ):
-                    typ = typing.get_args(typ)[0]  # first only
-
-                if isinstance(typ, str) and typ.lower() != arg.lower():
-                    handlers.remove(cmd)
-
-                elif isinstance(typ, ArgumentParser):
-                    _args[cmd].append(typ.parse(arg))
-
-                elif typ is str:
-                    _args[cmd].append(arg)
+        low = [arg.lower() for arg in arguments]
+        matched = []  # type: list[tuple[Handler, list]]
+        arg_errors = []  # type: list[Handler]
+        Handler.dispatch.walk(arguments, low, 0, [], matched, arg_errors)
 
-                elif typ is list or typ == list[str]:
-                    _args[cmd].append(arguments[idx:])
-
-        if not handlers:
-            raise CommandNotFoundError()
-
-        arg_errors = []
-        for cmd in list(handlers):
-            for typ in cmd.args[len(arguments):]:
-                if isinstance(typ, types.UnionType) and type(None) in typing.get_args(typ):
-                    continue
-                handlers.remove(cmd)
-                arg_errors.append(cmd)
-                break
-
-        if not handlers:
+        if not matched:
+            # too few arguments: show usage if only one handler matches the given ones
             if len(arg_errors) == 1:
                 raise CommandInfoError(arg_errors[0])
             raise CommandNotFoundError()
 
-        cmd = handlers[0]
+        # first registered wins
+        cmd, args = min(matched, key=lambda m: m[0].order)
         try:
-            kwargs = self.get_handler_params(ctx, cmd.handler, _args[cmd])
+            kwargs = self.get_handler_params(ctx, cmd, args)
         except IndexError:
             raise CommandInfoError(cmd)
 
         return cmd.handler, kwargs
 
-    def get_handler_params(self, ctx: CommandContext, function, args: list):
-        args = list(args)
-        parameters = list(inspect.signature(function).parameters.values())
-        parameters.pop(0)  # self
-        parameters.pop(0)  # ctx: CommandContext
+    def get_handler_params(self, ctx: CommandContext, cmd: Handler, args: list):
+        parameters = cmd.params
+        args_size = len(args)
 
-        kwargs = dict(self=self, ctx=ctx)
+        kwargs = {"self": self, "ctx": ctx}
         for idx, parameter in enumerate(parameters):
-            try:
-                kwargs[parameter.name] = args.pop(0)
-            except IndexError:
-                if isinstance(parameter.annotation, types.UnionType) and type(None) in typing.get_args(parameter.annotation):
-                    kwargs[parameter.name] = None
+            if idx < args_size:
+                kwargs[parameter.name] = args[idx]
 
-                elif parameter.default is not inspect.Signature.empty:
-                    kwargs[parameter.name] = parameter.default
+            elif cmd.param_optional[idx]:
+                kwargs[parameter.name] = None
 
-                else:
-                    log.debug(f"parameters: {parameters}")
-                    log.debug(f"parameter: {parameter}")
-                    log.debug(f"kwargs: {kwargs}")
-                    raise
+            elif cmd.param_defaults[idx] is not inspect.Signature.empty:
+                kwargs[parameter.name] = cmd.param_defaults[idx]
+
+            else:
+                log.debug(f"parameters: {parameters}")
+                log.debug(f"parameter: {parameter}")
+                log.debug(f"kwargs: {kwargs}")
+                raise IndexError(parameter.name)
 
         return kwargs
 
@@ -168,6 +254,20 @@ class MyCommandHandler(object):
     def cmdconf(self) -> CommandsConfig:
         return DNCoreAPI.commands().config
 
+    def find_handler_by_name(self, name: str) -> CommandHandler | None:
+        handler = self._handlers_by_name.get(name)
+        if handler is None or self.cmdmgr.handlers.get(handler.id) is not handler:
+            # rebuild on miss or stale entry
+            self._handlers_by_name = handlers_by_name = {}
+            for handler in self.cmdmgr.handlers.values():
+                if handler.name:
+                    handlers_by_name.setdefault(handler.name.lower(), handler)
+            handler = handlers_by_name.get(name)
+        return handler
+
+    def get_group_roles(self, name: str) -> list[str]:
+        return [f"<@&{role_id}>" for role_id, grp in self.cmdconf.roles.items() if grp == name and role_id.isdigit()]
+
     @Handler("listCommands")
     async def handler(self, ctx: CommandContext):
         handlers = set(self.cmdmgr.handlers.keys())
@@ -178,20 +278,25 @@ class MyCommandHandler(object):
             await ctx.send_warn(":grey_exclamation: コマンドがありません")
             return
 
-        unused_handlers = sorted(handlers)
+        names_by_handler = {}  # type: dict[str, list[str]]
+        for name, hid in self.cmdmgr.commands.items():
+            names_by_handler.setdefault(hid, []).append(name)
+
+        unused_handlers = []
         used_handlers = []
 
-        for handler_id in list(unused_handlers):
-            names = [name for name, hid in self.cmdmgr.commands.items() if hid == handler_id]
+        for handler_id in sorted(handlers):
+            names = names_by_handler.get(handler_id)
             if names:
                 unloaded = handler_id not in self.cmdmgr.handlers
                 used_handlers.append(dict(handler_id=handler_id, names=sorted(names), unloaded=unloaded))
-                unused_handlers.remove(handler_id)
+            else:
+                unused_handlers.append(handler_id)
 
         lines = []
         for used in used_handlers:
-            lines.append("{0}  {2}`({1})`{2}".format(
-                used["handler_id"], ", ".join(used["names"]), ["", "~~"][used["unloaded"]]))
+            strike = "~~" if used["unloaded"] else ""
+            lines.append(f"{used['handler_id']}  {strike}`({', '.join(used['names'])})`{strike}")
         lines.extend(unused_handlers)
 
         embed = discord.Embed(
@@ -200,7 +305,7 @@ class MyCommandHandler(object):
         )
         await ctx.send_info(embed)
 
-    @Handler("addCommand", str, str | None, str | None)
+    @Handler("addCommand", NameArgument(), str | None, str | None)
     async def handler(self, ctx: CommandContext, name: str, handler_id: str | None, category: str | None):
         """
         {command} addCommand (コマンド名) [ハンドラID] [カテゴリ]
@@ -209,19 +314,18 @@ class MyCommandHandler(object):
         ※ ハンドラIDを省略した場合は、
         　 コマンド名に一致するハンドラを1つ選択します
         """
-        name = name.lower()
-        category_name, category = CategoryArgument().parse(category or DEFAULT_CATEGORY)
+        category_name, category = CategoryArgument().parse((category or DEFAULT_CATEGORY).lower())
 
         if handler_id is None:
-            handler = None
-            for hid, handler in self.cmdmgr.handlers.items():
-                if handler.name and name == handler.name.lower():
-                    break
+            handler = self.find_handler_by_name(name)
+            if handler is None:
+                await ctx.send_warn(f":grey_exclamation: コマンド名 `{name}` に一致するハンドラがありません。ハンドラIDを指定してください")
+                return
         else:
-            handler = HandlerArgument().parse(handler_id)
+            handler = HandlerArgument().parse(handler_id.lower())
 
         if name in category.commands:
-            await ctx.send_warn(":grey_exclamation: 既に追加されています")
+            await ctx.send_warn(_ERR_ALREADY_ADDED)
 
         else:
             category.commands[name] = entry = CommandEntry()
@@ -230,117 +334,103 @@ class MyCommandHandler(object):
             await ctx.send_info(f":ok_hand: コマンド **`{name}`** を追加しました ({handler.id})")
 
     @Handler("removeCommand", CommandEntryArgument())
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandEntry]):
+    async def handler(self, ctx: CommandContext, name: str, command: CommandEntry):
         """
         {command} removeCommand (コマンド名)
 
         コマンドを削除します
         ※ 別名などのコマンド設定も削除されます
         """
-        name, command = name
-
         removed = 0
         for category in self.cmdconf.categories.values():
-            if name in category.commands and category.commands[name].handler:
-                category.commands[name].handler = None
+            entry = category.commands.get(name)
+            if entry and entry.handler:
+                entry.handler = None
                 removed += 1
 
         if not removed:
-            await ctx.send_info(":grey_exclamation: コマンド **`{name}`** は設定されていません")
+            await ctx.send_info(f":grey_exclamation: コマンド **`{name}`** は設定されていません")
 
         else:
             self.cmdmgr.remap(force_save=True)
             await ctx.send_info(f":ok_hand: コマンド **`{name}`** を削除しました")
 
-    @Handler("command", CommandEntryArgument())
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandEntry]):
-        """
-        {command} command (コマンド) info
-
-        コマンド情報を表示します
-        """
-        name, entry = name
-
-        await ctx.send_info("\n".join([
-            f":white_small_square: コマンド: **`{name}`**",
-            f":white_small_square: ハンドラ: {entry.handler or ''}",
-            f":white_small_square: 別名　　: {', '.join(entry.aliases)}",
-            f":white_small_square: 説明文　: {['初期値', '設定済み'][bool(entry.usage)]}"
-        ]))
-
-    @Handler("command", CommandEntryArgument(), "info")
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandEntry]):
+    @Handler("command", CommandEntryArgument(), OptionalLiteral("info"))
+    async def handler(self, ctx: CommandContext, name: str, entry: CommandEntry):
         """
         {command} command (コマンド) info
 
         コマンド情報を表示します
         """
-        name, entry = name
-
         await ctx.send_info("\n".join([
             f":white_small_square: コマンド: **`{name}`**",
             f":white_small_square: ハンドラ: {entry.handler or ''}",
             f":white_small_square: 別名　　: {', '.join(entry.aliases)}",
-            f":white_small_square: 説明文　: {['初期値', '設定済み'][bool(entry.usage)]}"
+            f":white_small_square: 説明文　: {'設定済み' if entry.usage else '初期値'}"
         ]))
 
     @Handler("command", CommandEntryArgument(), "setHandler", HandlerArgument())
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandEntry], handler_id: CommandHandler):
+    async def handler(self, ctx: CommandContext, name: str, entry: CommandEntry, handler_id: CommandHandler):
         """
         {command} command (コマンド) setHandler (ハンドラID)
 
         コマンドの実行元ハンドラを設定します
         """
-        name, entry = name
+        if entry.handler == handler_id.id:
+            await ctx.send_warn(":grey_exclamation: 既に同じハンドラが設定されています")
+            return
+
         entry.handler = handler_id.id
         self.cmdmgr.remap(force_save=True)
         await ctx.send_info(f":ok_hand: コマンド **`{name}`** の実行ハンドラを `{entry.handler}` に設定しました")
 
     @Handler("command", CommandEntryArgument(), "addAlias", list[str])
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandEntry], alias: list[str]):
+    async def handler(self, ctx: CommandContext, name: str, entry: CommandEntry, alias: list[str]):
         """
         {command} command (コマンド) addAlias (別名...)
 
         コマンドに別名を追加します
         """
-        name, entry = name
         if not alias:
             await ctx.send_warn(":grey_exclamation: 追加する別名を指定してください")
             return
 
-        added = 0
+        alias = [item.lower() for item in alias]
+        existing = set(entry.aliases)
+        new_aliases = []
         for item in alias:
-            if item.lower() not in entry.aliases:
-                added += 1
-                entry.aliases.append(item.lower())
+            if item not in existing:
+                existing.add(item)
+                new_aliases.append(item)
+
+        entry.aliases.extend(new_aliases)
+        added = len(new_aliases)
 
         if not added:
-            await ctx.send_info(":grey_exclamation: 既に追加されています")
+            await ctx.send_info(_ERR_ALREADY_ADDED)
 
         else:
             self.cmdmgr.remap(force_save=True)
             await ctx.send_info(
-                f":ok_hand: 別名コマンド **`{alias[0].lower()}`** を追加しました" if added == 1 else
+                f":ok_hand: 別名コマンド **`{alias[0]}`** を追加しました" if added == 1 else
                 f":ok_hand: 別名コマンド {added}個 を追加しました"
             )
 
     @Handler("command", CommandEntryArgument(), "removeAlias", list[str])
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandEntry], alias: list[str]):
+    async def handler(self, ctx: CommandContext, name: str, entry: CommandEntry, alias: list[str]):
         """
         {command} command (コマンド) removeAlias (別名...)
 
         コマンドの別名を削除します
         """
-        name, entry = name
         if not alias:
             await ctx.send_warn(":grey_exclamation: 削除する別名を指定してください")
             return
 
-        removed = 0
-        for item in alias:
-            if item.lower() in entry.aliases:
-                removed += 1
-                entry.aliases.remove(item.lower())
+        to_remove = {item.lower() for item in alias}.intersection(entry.aliases)
+        if to_remove:
+            entry.aliases[:] = [item for item in entry.aliases if item not in to_remove]
+        removed = len(to_remove)
 
         if not removed:
             await ctx.send_info(":grey_exclamation: 指定された別名は削除されませんでした")
@@ -350,14 +440,12 @@ class MyCommandHandler(object):
             await ctx.send_info(f":ok_hand: 別名コマンド {removed}個 を削除しました")
 
     @Handler("command", CommandEntryArgument(), "setUsage", str)
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandEntry], usage: str):
+    async def handler(self, ctx: CommandContext, name: str, entry: CommandEntry, usage: str):
         """
         {command} command (コマンド) setUsage (使用法)
 
         コマンド使用法文を設定します
         """
-        name, entry = name
-
         if entry.usage == usage:
             await ctx.send_warn(":grey_exclamation: 既に同じカスタム使用法文が設定されています")
             return
@@ -367,14 +455,12 @@ class MyCommandHandler(object):
         await ctx.send_info(":ok_hand: カスタム使用法を設定しました")
 
     @Handler("command", CommandEntryArgument(), "resetUsage")
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandEntry]):
+    async def handler(self, ctx: CommandContext, name: str, entry: CommandEntry):
         """
         {command} command (コマンド) resetUsage
 
         コマンド使用法文をデフォルトに設定します
         """
-        name, entry = name
-
         if entry.usage is None:
             await ctx.send_warn(":grey_exclamation: カスタム使用法は設定されていません")
             return
@@ -384,15 +470,12 @@ class MyCommandHandler(object):
         await ctx.send_info(":ok_hand: カスタム使用法を削除しました")
 
     @Handler("command", CommandEntryArgument(), "setCategory", CategoryArgument())
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandEntry], category: tuple[str, CommandCategory]):
+    async def handler(self, ctx: CommandContext, name: str, entry: CommandEntry, category_name: str, category: CommandCategory):
         """
         {command} command (コマンド) setCategory (カテゴリ)
 
         コマンドを指定カテゴリに設定します
         """
-        name, entry = name
-        category_name, category = category
-
         if name in category.commands:
             await ctx.send_warn(":grey_exclamation: 既に指定カテゴリに設定されています")
             return
@@ -407,17 +490,15 @@ class MyCommandHandler(object):
         await ctx.send_info(f":ok_hand: `{category.label or category_name}` カテゴリに設定しました")
 
     @Handler("command", CommandEntryArgument(), "resetCategory")
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandEntry]):
+    async def handler(self, ctx: CommandContext, name: str, entry: CommandEntry):
         """
         {command} command (コマンド) resetCategory
 
         コマンドをその他カテゴリに設定します
         """
-        name, entry = name
-
         removed = 0
         for category_name, category in self.cmdconf.categories.items():
-            if DEFAULT_CATEGORY != category_name and category.commands.pop(name, None):
+            if DEFAULT_CATEGORY != category_name and category.commands.pop(name, _MISSING) is not _MISSING:
                 removed += 1
 
         if not removed:
@@ -425,20 +506,18 @@ class MyCommandHandler(object):
             return
 
         self.cmdmgr.remap(force_save=True)
-        await ctx.send_info(f":ok_hand: その他カテゴリに設定しました")
+        await ctx.send_info(":ok_hand: その他カテゴリに設定しました")
 
     @Handler("command", CommandEntryArgument(), "test", str)
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandEntry], user: str):
+    async def handler(self, ctx: CommandContext, name: str, command: CommandEntry, user: str):
         """
         {command} command (コマンド) test (ユーザー)
 
         指定ユーザーがコマンドの実行権限を持っているかテストします
         """
-        name, command = name
-
         user_id = ctx.arguments.get_user(3, default=None)
         if user_id is None:
-            await ctx.send_warn(":grey_exclamation: 指定されたユーザーを特定できませんでした。数字IDを指定してください。")
+            await ctx.send_warn(_ERR_UNKNOWN_USER)
             return
 
         try:
@@ -469,12 +548,16 @@ class MyCommandHandler(object):
             await ctx.send_warn(":grey_exclamation: グループがありません")
             return
 
+        roles_by_group = {}  # type: dict[str, int]
+        for _grp in self.cmdconf.roles.values():
+            roles_by_group[_grp] = roles_by_group.get(_grp, 0) + 1
+
         lines = []
         for name, group in groups.items():
-            roles = sum(1 for _, _grp in self.cmdconf.roles.items() if _grp == name)
+            roles = roles_by_group.get(name, 0)
 
             line = f"・{name}"
-            line += f" (コマンド: 全て" if group.allowed_all() else f" (コマンド: {len(group.commands)}"
+            line += " (コマンド: 全て" if group.allowed_all() else f" (コマンド: {len(group.commands)}"
             line += f"、ユーザー: {len(group.users)}" if group.users else ""
             line += f"、役職: {roles})" if roles else ")"
             lines.append(line)
@@ -484,22 +567,20 @@ class MyCommandHandler(object):
             description="\n".join(lines)
         ))
 
-    @Handler("createGroup", str, list[str] | None)
+    @Handler("createGroup", NameArgument(), list[str] | None)
     async def handler(self, ctx: CommandContext, name: str, allowed_commands: list[str] | None):
         """
         {command} createGroup (グループ名) [許可コマンド...]
 
         許可グループを作成します
         """
-        name = name.lower()
-
         if name in self.cmdconf.groups:
             await ctx.send_warn(":grey_exclamation: 既に存在するグループ名です")
             return
 
         group = PermissionGroup()
         if allowed_commands:
-            group.commands.extend(allowed_commands)
+            group.commands.extend(dict.fromkeys(command.lower() for command in allowed_commands))
 
         self.cmdconf.groups[name] = group
         self.cmdmgr.remap(force_save=True)
@@ -507,58 +588,31 @@ class MyCommandHandler(object):
         await ctx.send_info(f":ok_hand: 権限グループ `{name}` を作成しました")
 
     @Handler("deleteGroup", GroupArgument())
-    async def handler(self, ctx: CommandContext, name: tuple[str, PermissionGroup]):
+    async def handler(self, ctx: CommandContext, name: str, group: PermissionGroup):
         """
         {command} deleteGroup (グループ名)
 
         許可グループを削除します
         """
-        name, group = name
-
         self.cmdconf.groups.pop(name)
         self.cmdmgr.remap(force_save=True)
 
         await ctx.send_info(f":ok_hand: 権限グループ `{name}` を削除しました")
 
-    @Handler("group", GroupArgument())
-    async def handler(self, ctx: CommandContext, name: tuple[str, PermissionGroup]):
+    @Handler("group", GroupArgument(), OptionalLiteral("info"))
+    async def handler(self, ctx: CommandContext, name: str, group: PermissionGroup):
         """
         {command} group (グループ) info
 
         グループの情報を表示します
         """
-        name, group = name
-
         if group.allowed_all():
-            command_lines = [f":white_small_square: 許可コマンド:\n　全て許可"]
+            command_lines = [":white_small_square: 許可コマンド:\n　全て許可"]
         else:
             command_lines = [f":white_small_square: 許可コマンド({len(group.commands)}):\n　" + ", ".join(group.commands)]
 
         users = [f"<@{user_id}>" for user_id in group.users]
-        roles = [f"<@&{str(role_id)}>" for role_id, grp in self.cmdconf.roles.items() if grp == name and role_id.isdigit()]
-
-        user_lines = [f":white_small_square: 許可ユーザー({len(group.users)}):\n　" + ", ".join(users)]
-        role_lines = [f":white_small_square: 許可役職({len(roles)}):\n　" + ", ".join(roles)]
-        await ctx.send_info("\n".join([
-            f":white_small_square: グループ: **`{name}`**", *command_lines, *user_lines, *role_lines,
-        ]))
-
-    @Handler("group", GroupArgument(), "info")
-    async def handler(self, ctx: CommandContext, name: tuple[str, PermissionGroup]):
-        """
-        {command} group (グループ) info
-
-        グループの情報を表示します
-        """
-        name, group = name
-
-        if group.allowed_all():
-            command_lines = [f":white_small_square: 許可コマンド:\n　全て許可"]
-        else:
-            command_lines = [f":white_small_square: 許可コマンド({len(group.commands)}):\n　" + ", ".join(group.commands)]
-
-        users = [f"<@{user_id}>" for user_id in group.users]
-        roles = [f"<@&{str(role_id)}>" for role_id, grp in self.cmdconf.roles.items() if grp == name and role_id.isdigit()]
+        roles = self.get_group_roles(name)
 
         user_lines = [f":white_small_square: 許可ユーザー({len(group.users)}):\n　" + ", ".join(users)]
         role_lines = [f":white_small_square: 許可役職({len(roles)}):\n　" + ", ".join(roles)]
@@ -567,17 +621,14 @@ class MyCommandHandler(object):
         ]))
 
     @Handler("group", GroupArgument(), "addCommand", CommandEntryArgument())
-    async def handler(self, ctx: CommandContext, name: tuple[str, PermissionGroup], command: tuple[str, CommandEntry]):
+    async def handler(self, ctx: CommandContext, name: str, group: PermissionGroup, command_name: str, command: CommandEntry):
         """
         {command} group (グループ) addCommand (コマンド...)
 
         許可するコマンドをグループに追加します
         """
-        name, group = name
-        command_name, command = command
-
         if group.allowed_all():
-            await ctx.send_warn(":grey_exclamation: 全許可グループのためコマンドを指定できません")
+            await ctx.send_warn(_ERR_ALLOWED_ALL)
             return
 
         elif command_name in group.commands:
@@ -589,17 +640,14 @@ class MyCommandHandler(object):
         await ctx.send_info(f":ok_hand: `{name}` グループの `{command_name}` コマンドを許可しました")
 
     @Handler("group", GroupArgument(), "removeCommand", CommandEntryArgument())
-    async def handler(self, ctx: CommandContext, name: tuple[str, PermissionGroup], command: tuple[str, CommandEntry]):
+    async def handler(self, ctx: CommandContext, name: str, group: PermissionGroup, command_name: str, command: CommandEntry):
         """
         {command} group (グループ) removeCommand (コマンド)
 
         許可されているコマンドをグループから削除します
         """
-        name, group = name
-        command_name, command = command
-
         if group.allowed_all():
-            await ctx.send_warn(":grey_exclamation: 全許可グループのためコマンドを指定できません")
+            await ctx.send_warn(_ERR_ALLOWED_ALL)
             return
 
         elif command_name not in group.commands:
@@ -611,21 +659,19 @@ class MyCommandHandler(object):
         await ctx.send_info(f":ok_hand: `{name}` グループの `{command_name}` コマンドを剝奪しました")
 
     @Handler("group", GroupArgument(), "addUser", str)
-    async def handler(self, ctx: CommandContext, name: tuple[str, PermissionGroup], user: str):
+    async def handler(self, ctx: CommandContext, name: str, group: PermissionGroup, user: str):
         """
         {command} group (グループ) addUser (ユーザー)
 
         指定ユーザーをグループに追加します
         """
-        name, group = name
-
         user = ctx.arguments.get_user(3, default=None)
         if user is None:
-            await ctx.send_warn(":grey_exclamation: 指定されたユーザーを特定できませんでした。数字IDを指定してください。")
+            await ctx.send_warn(_ERR_UNKNOWN_USER)
             return
 
         if user in group.users:
-            await ctx.send_warn(f":grey_exclamation: 既にグループに設定されています")
+            await ctx.send_warn(":grey_exclamation: 既にグループに設定されています")
             return
 
         group.users.append(user)
@@ -639,21 +685,19 @@ class MyCommandHandler(object):
         await ctx.send_info(f":ok_hand: `{name}` グループにユーザー `{user_name}` を追加しました")
 
     @Handler("group", GroupArgument(), "removeUser", str)
-    async def handler(self, ctx: CommandContext, name: tuple[str, PermissionGroup], user: str):
+    async def handler(self, ctx: CommandContext, name: str, group: PermissionGroup, user: str):
         """
         {command} group (グループ) removeUser (ユーザー)
 
         指定ユーザーをグループから削除します
         """
-        name, group = name
-
         user = ctx.arguments.get_user(3, default=None)
         if user is None:
-            await ctx.send_warn(":grey_exclamation: 指定されたユーザーを特定できませんでした。数字IDを指定してください。")
+            await ctx.send_warn(_ERR_UNKNOWN_USER)
             return
 
         if user not in group.users:
-            await ctx.send_warn(f":grey_exclamation: 指定されたユーザーは所属していません")
+            await ctx.send_warn(":grey_exclamation: 指定されたユーザーは所属していません")
             return
 
         group.users.remove(user)
@@ -667,22 +711,20 @@ class MyCommandHandler(object):
         await ctx.send_info(f":ok_hand: `{name}` グループのユーザー `{user_name}` を削除しました")
 
     @Handler("group", GroupArgument(), "addRole", str)
-    async def handler(self, ctx: CommandContext, name: tuple[str, PermissionGroup], role: str):
+    async def handler(self, ctx: CommandContext, name: str, group: PermissionGroup, role: str):
         """
         {command} group (グループ) addRole (役職)
 
         指定役職をグループに設定します
         """
-        name, group = name
-
         role = ctx.arguments.get_role(3, default=None)
         if role is None:
-            await ctx.send_warn(":grey_exclamation: 指定された役職を特定できませんでした。数字IDを指定してください。")
+            await ctx.send_warn(_ERR_UNKNOWN_ROLE)
             return
 
         roles = self.cmdconf.roles  # role: groupName
         if roles.get(str(role)) == name:
-            await ctx.send_warn(f":grey_exclamation: 既に設定されています")
+            await ctx.send_warn(_ERR_ALREADY_SET)
             return
 
         self.cmdconf.roles[str(role)] = name
@@ -691,22 +733,20 @@ class MyCommandHandler(object):
         await ctx.send_info(f":ok_hand: 役職 `{role}` を `{name}` グループに割り当てました")
 
     @Handler("group", GroupArgument(), "removeRole", str)
-    async def handler(self, ctx: CommandContext, name: tuple[str, PermissionGroup], role: str):
+    async def handler(self, ctx: CommandContext, name: str, group: PermissionGroup, role: str):
         """
         {command} group (グループ) removeRole (役職)
 
         指定役職のグループを削除します
         """
-        name, group = name
-
         role = ctx.arguments.get_role(3, default=None)
         if role is None:
-            await ctx.send_warn(":grey_exclamation: 指定された役職を特定できませんでした。数字IDを指定してください。")
+            await ctx.send_warn(_ERR_UNKNOWN_ROLE)
             return
 
         roles = self.cmdconf.roles  # role: groupName
         if roles.get(str(role)) != name:
-            await ctx.send_warn(f":grey_exclamation: 設定されていません")
+            await ctx.send_warn(":grey_exclamation: 設定されていません")
             return
 
         self.cmdconf.roles.pop(str(role))
@@ -739,14 +779,13 @@ class MyCommandHandler(object):
             description="\n".join(lines)
         ))
 
-    @Handler("addCategory", str, str | None, list[str] | None)
+    @Handler("addCategory", NameArgument(), str | None, list[str] | None)
     async def handler(self, ctx: CommandContext, name: str, label: str | None, commands: list[str] | None):
         """
         {command} addCategory (カテゴリ名) [表示名] [コマンド...]
 
         カテゴリを作成します
         """
-        name = name.lower()
         if name in self.cmdconf.categories:
             await ctx.send_warn(f":grey_exclamation: カテゴリ `{name}` は既に存在します")
             return
@@ -756,15 +795,24 @@ class MyCommandHandler(object):
 
         if commands:
             for cmd_name in commands:
+                cmd_name = cmd_name.lower()
+                if cmd_name in category.commands:
+                    continue
+
+                cmd_entry = None
+
                 for _category in self.cmdconf.categories.values():
-                    cmd_entry = _category.commands.pop(cmd_name.lower(), None)
+                    # keep the first entry, drop the other copies
+                    _entry = _category.commands.pop(cmd_name, _MISSING)
+                    if _entry is not _MISSING and cmd_entry is None:
+                        cmd_entry = _entry
 
-                    if cmd_entry is None:
-                        cmd_entry = CommandEntry()
-                    else:
-                        added_commands += 1
+                if cmd_entry is None:
+                    cmd_entry = CommandEntry()
+                else:
+                    added_commands += 1
 
-                    category.commands[cmd_name.lower()] = cmd_entry
+                category.commands[cmd_name] = cmd_entry
 
         self.cmdconf.categories[name] = category
         self.cmdmgr.remap(force_save=True)
@@ -772,90 +820,78 @@ class MyCommandHandler(object):
                             (f" (コマンド: {added_commands}個)" if added_commands else ""))
 
     @Handler("removeCategory", CategoryArgument())
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandCategory]):
+    async def handler(self, ctx: CommandContext, name: str, category: CommandCategory):
         """
         {command} removeCategory (カテゴリ名)
 
         カテゴリを削除します
         ※ 設定されていたコマンドはその他カテゴリに移動されます
         """
-        name, category = name
-
         if name == DEFAULT_CATEGORY:
             await ctx.send_warn(":grey_exclamation: デフォルトカテゴリは削除できません")
             return
 
-        if DEFAULT_CATEGORY in self.cmdconf.categories:
-            self.cmdconf.categories[DEFAULT_CATEGORY].commands.update(category.commands)
+        default_category = self.cmdconf.categories.get(DEFAULT_CATEGORY)
+        if default_category is not None:
+            default_category.commands.update(category.commands)
 
         self.cmdconf.categories.pop(name)
         self.cmdmgr.remap(force_save=True)
 
         await ctx.send_info(f":ok_hand: カテゴリ `{name}` を削除しました")
 
-    @Handler("category", CategoryArgument())
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandCategory]):
-        """
-        {command} category (カテゴリ) info
-
-        カテゴリの情報を表示します
-        """
-        name, category = name
-
-        await ctx.send_info("\n".join([
-            f":white_small_square: カテゴリ: **`{name}`**" + (f" (表示名: {category.label})" if category.label else ""),
-            f":white_small_square: コマンド({len(category.commands)}):\n　" + ", ".join(category.commands.keys()),
-        ]))
-
-    @Handler("category", CategoryArgument(), "info")
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandCategory]):
+    @Handler("category", CategoryArgument(), OptionalLiteral("info"))
+    async def handler(self, ctx: CommandContext, name: str, category: CommandCategory):
         """
         {command} category (カテゴリ) info
 
         カテゴリの情報を表示します
         """
-        name, category = name
-
         await ctx.send_info("\n".join([
             f":white_small_square: カテゴリ: **`{name}`**" + (f" (表示名: {category.label})" if category.label else ""),
             f":white_small_square: コマンド({len(category.commands)}):\n　" + ", ".join(category.commands.keys()),
         ]))
 
     @Handler("category", CategoryArgument(), "move", str)
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandCategory], number: str):
+    async def handler(self, ctx: CommandContext, name: str, category: CommandCategory, number: str):
         """
         {command} category (カテゴリ) move (番号)
 
         グループを指定番号に並び替えます
         """
-        name, category = name
-
         try:
             number = int(number)
         except ValueError:
             await ctx.send_warn(":grey_exclamation: 数値を指定してください")
             return
 
-        self.cmdconf.categories.pop(name)
-        categories = list(self.cmdconf.categories.items())
-        index = max(0, min(number - 1, len(categories)))
+        categories = self.cmdconf.categories
+        names = list(categories)
+        position = names.index(name)
+        names.pop(position)
+        index = max(0, min(number - 1, len(names)))
 
-        categories.insert(index, (name, category))
-        self.cmdconf.categories.clear()
-        self.cmdconf.categories.update(categories)
+        if index == position:
+            await ctx.send_warn(f":grey_exclamation: カテゴリ `{name}` は既に**{index+1}**番目です")
+            return
+
+        categories.pop(name)
+
+        # re-insert only the entries that follow the new position
+        categories[name] = category
+        for _name in names[index:]:
+            categories[_name] = categories.pop(_name)
 
         self.cmdmgr.remap(force_save=True)
         await ctx.send_info(f":ok_hand: カテゴリ `{name}` を**{index+1}**番目に移動しました")
 
     @Handler("category", CategoryArgument(), "setLabel", str)
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandCategory], label: str):
+    async def handler(self, ctx: CommandContext, name: str, category: CommandCategory, label: str):
         """
         {command} category (カテゴリ) setLabel (表示名)
 
         カテゴリ表示名を設定します
         """
-        name, category = name
-
         if category.label == label:
             await ctx.send_warn(":grey_exclamation: 既に表示名が設定されています")
             return
@@ -865,50 +901,44 @@ class MyCommandHandler(object):
         await ctx.send_info(f":ok_hand: カテゴリ `{name}` の表示名を {label} に設定しました")
 
     @Handler("category", CategoryArgument(), "addCommand", CommandEntryArgument())
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandCategory], command: tuple[str, CommandEntry]):
+    async def handler(self, ctx: CommandContext, name: str, category: CommandCategory, command_name: str, command: CommandEntry):
         """
         {command} category (カテゴリ) addCommand (コマンド...)
 
         カテゴリにコマンドを追加します
         """
-        name, category = name
-        command_name, command = command
-
         if command_name in category.commands:
-            await ctx.send_warn(":grey_exclamation: 既に設定されています")
+            await ctx.send_warn(_ERR_ALREADY_SET)
             return
 
         # delete other
         for _category in self.cmdconf.categories.values():
-            _category.commands.pop(name, None)
+            _category.commands.pop(command_name, None)
 
         category.commands[command_name] = command
 
         self.cmdmgr.remap(force_save=True)
         await ctx.send_info(f":ok_hand: `{command_name}` コマンドを追加しました")
 
-    @Handler("category", CategoryArgument(), "removeCommand", str)
-    async def handler(self, ctx: CommandContext, name: tuple[str, CommandCategory], command: str):
+    @Handler("category", CategoryArgument(), "removeCommand", NameArgument())
+    async def handler(self, ctx: CommandContext, name: str, category: CommandCategory, command: str):
         """
         {command} category (カテゴリ) removeCommand (コマンド)
 
         カテゴリからコマンドを削除し、その他カテゴリに移動します
         """
-        name, category = name
-        command = command.lower()
-
-        if command not in category.commands:
-            await ctx.send_warn(":grey_exclamation: コマンドは設定されていません")
-            return
-
         if name == DEFAULT_CATEGORY:
             await ctx.send_warn(":grey_exclamation: デフォルトカテゴリからは削除できません")
             return
 
-        cmd_entry = category.commands.pop(command)
+        cmd_entry = category.commands.pop(command, _MISSING)
+        if cmd_entry is _MISSING:
+            await ctx.send_warn(":grey_exclamation: コマンドは設定されていません")
+            return
 
-        if cmd_entry and DEFAULT_CATEGORY in self.cmdconf.categories:
-            self.cmdconf.categories[DEFAULT_CATEGORY].commands[command] = cmd_entry
+        default_category = self.cmdconf.categories.get(DEFAULT_CATEGORY)
+        if cmd_entry and default_category is not None:
+            default_category.commands[command] = cmd_entry
 
         self.cmdmgr.remap(force_save=True)
         await ctx.send_info(f":ok_hand: `{command}` コマンドをカテゴリから削除しました")
@@ -1,3 +1,4 @@
+import functools
 import textwrap
 
 import discord
@@ -8,50 +9,61 @@ from dncore.plugin import Plugin
 from .errors import CommandMessageError, CommandNotFoundError, CommandInfoError
 from .mgrcmd import MyCommandHandler
 
+_HELP_PARTS = textwrap.dedent("""
+    コマンド設定
+    > {cmd} listcommands
+    > {cmd} addcommand (name) [handlerId] [category]
+    > {cmd} removecommand (name)
+    > {cmd} command (name) info
+    > {cmd} command (name) sethandler (handlerId)
+    > {cmd} command (name) addalias (alias...)
+    > {cmd} command (name) removealias (alias...)
+    > {cmd} command (name) setusage (usageText)
+    > {cmd} command (name) resetusage
+    > {cmd} command (name) setcategory (category)
+    > {cmd} command (name) resetcategory
+    > {cmd} command (name) test (user)
+
+    許可グループ設定
+    > {cmd} listgroups
+    > {cmd} creategroup (name) [commands...]
+    > {cmd} deletegroup (name)
+    > {cmd} group (name) info
+    > {cmd} group (name) addcommand (command)
+    > {cmd} group (name) removecommand (command)
+    > {cmd} group (name) adduser (userId)
+    > {cmd} group (name) removeuser (userId)
+    > {cmd} group (name) addrole (roleId)
+    > {cmd} group (name) removerole (roleId)
+
+    カテゴリ設定
+    > {cmd} listcategories
+    > {cmd} addcategory (name) [label] [commands...]
+    > {cmd} removecategory (name)
+    > {cmd} category (name) info
+    > {cmd} category (name) move (number)
+    > {cmd} category (name) setlabel (label)
+    > {cmd} category (name) addcommand (command)
+    > {cmd} category (name) removecommand (command)
+""").split("{cmd}")
+
 
 class CommandConfiguratorPlugin(Plugin):
     def __init__(self):
         self.commands = MyCommandHandler()
 
     @staticmethod
+    @functools.lru_cache(maxsize=32)
     def list_all(prefix: str, label: str):
-        return textwrap.dedent("""
-        コマンド設定
-        > {cmd} listcommands
-        > {cmd} addcommand (name) [handlerId] [category]
-        > {cmd} removecommand (name)
-        > {cmd} command (name) info
-        > {cmd} command (name) sethandler (handlerId)
-        > {cmd} command (name) addalias (alias...)
-        > {cmd} command (name) removealias (alias...)
-        > {cmd} command (name) setusage (usageText)
-        > {cmd} command (name) resetusage
-        > {cmd} command (name) setcategory (category)
-        > {cmd} command (name) resetcategory
-        > {cmd} command (name) test (user)
-        
-        許可グループ設定
-        > {cmd} listgroups
-        > {cmd} creategroup (name) [commands...]
-        > {cmd} deletegroup (name)
-        > {cmd} group (name) info
-        > {cmd} group (name) addcommand (command)
-        > {cmd} group (name) removecommand (command)
-        > {cmd} group (name) adduser (userId)
-        > {cmd} group (name) removeuser (userId)
-        > {cmd} group (name) addrole (roleId)
-        > {cmd} group (name) removerole (roleId)
-        
-        カテゴリ設定
-        > {cmd} listcategories
-        > {cmd} addcategory (name) [label] [commands...]
-        > {cmd} removecategory (name)
-        > {cmd} category (name) info
-        > {cmd} category (name) move (number)
-        > {cmd} category (name) setlabel (label)
-        > {cmd} category (name) addcommand (command)
-        > {cmd} category (name) removecommand (command)
-        """).format(cmd=prefix + label)
+        return (prefix + label).join(_HELP_PARTS)
+
+    @classmethod
+    def help_embed(cls, prefix: str, label: str):
+        # Embed is mutable, build a new one around the cached description
+        return discord.Embed(
+            title=":jigsaw: Command Configurator - 操作一覧 :jigsaw:",
+            description=cls.list_all(prefix, label)
+        )
 
     @oncommand(category="utility")
     async def cmd_cconf(self, ctx: CommandContext):
@@ -69,12 +81,9 @@ class CommandConfiguratorPlugin(Plugin):
         `{command} help`
         """
 
-        if ctx.arguments.get(default="") == "help":
-            embed = discord.Embed(
-                title=":jigsaw: Command Configurator - 操作一覧 :jigsaw:",
-                description=self.list_all(ctx.prefix, ctx.execute_name)
-            )
-            await ctx.send_info(embed)
+        arguments = ctx.arguments
+        if arguments and arguments[0] == "help":
+            await ctx.send_info(self.help_embed(ctx.prefix, ctx.execute_name))
             return
 
         try:
@@ -84,15 +93,11 @@ class CommandConfiguratorPlugin(Plugin):
             return
         except CommandInfoError as e:
             if e.command.docs:
-                docs = textwrap.dedent(e.command.docs)
-                await ctx.client.send_command_usage(ctx, ctx.command, docs)
+                await ctx.client.send_command_usage(ctx, ctx.command, e.command.docs)
                 return
             raise CommandUsageError() from e
 
         except CommandNotFoundError as e:
             raise CommandUsageError() from e
 
-        try:
-            await command(**kwargs)
-        except Exception:
-            raise
+        await command(**kwargs)